@@ -2,18 +2,33 @@
 Main Flask application for Guess the Word Game - OpenText Project
 This file contains only the routes and Flask app configuration
 """
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, g
+from flask.json.provider import JSONProvider
+from flask_session import Session
+import orjson
 from datetime import date
 from functools import wraps
 
 # Import our custom modules
 from config import Config
 from models import UserValidator, GameLogic, User, GameSession
-from database import user_repo, game_repo, report_repo
+from database import user_repo, game_repo, report_repo, redis_client
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that uses orjson for faster encoding and decoding"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config.from_object(Config)
+app.config['SESSION_REDIS'] = redis_client
+Session(app)
 
 # --- DECORATORS ---
 def login_required(f):
@@ -36,6 +51,24 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# --- HELPERS ---
+@app.before_request
+def set_today():
+    """Read the current date once per request"""
+    g.today = date.today()
+
+def refresh_games_today():
+    """Reload today's game count for the current player into the session"""
+    session['games_today'] = game_repo.get_daily_game_count(session['user_id'], g.today)
+    session['games_today_date'] = str(g.today)
+    return session['games_today']
+
+def get_games_today():
+    """Get today's game count from the session, refreshing it on a new day"""
+    if session.get('games_today_date') != str(g.today) or 'games_today' not in session:
+        return refresh_games_today()
+    return session['games_today']
+
 # --- MAIN ROUTES ---
 @app.route('/')
 def index():
@@ -94,6 +127,8 @@ def login():
             session['user_id'] = user_data['id']
             session['username'] = user_data['username']
             session['user_type'] = user_data['user_type']
+            if user_data['user_type'] == 'player':
+                refresh_games_today()
             
             flash(f'Welcome back, {user_data["username"]}!', 'success')
             return redirect(url_for('dashboard'))
@@ -118,8 +153,7 @@ def dashboard():
         return render_template('admin_dashboard.html')
     else:
         # Get today's game count for player
-        today = date.today()
-        games_today = game_repo.get_daily_game_count(session['user_id'], today)
+        games_today = get_games_today()
         can_play = games_today < Config.MAX_DAILY_GAMES
         
         return render_template('player_dashboard.html', 
@@ -136,9 +170,9 @@ def game():
         flash('Admins cannot play the game. Use admin functions instead.', 'error')
         return redirect(url_for('dashboard'))
     
-    # Check if player can start a new game
-    today = date.today()
-    games_today = game_repo.get_daily_game_count(session['user_id'], today)
+    # Check if player can start a new game against the database, since the
+    # session count is per browser and could let a player exceed the limit
+    games_today = refresh_games_today()
     
     if games_today >= Config.MAX_DAILY_GAMES:
         flash(f'Daily limit reached! You can play {Config.MAX_DAILY_GAMES} games per day.', 'error')
@@ -150,12 +184,15 @@ def game():
         flash('Error starting game. Please try again.', 'error')
         return redirect(url_for('dashboard'))
     
-    session_id = game_repo.create_game_session(session['user_id'], target_word)
+    session_id = game_repo.create_game_session(session['user_id'], target_word, g.today)
     if not session_id:
         flash('Error creating game session. Please try again.', 'error')
         return redirect(url_for('dashboard'))
     
+    report_repo.invalidate(session['username'], g.today)
+    
     # Set up game session data
+    session['games_today'] = games_today + 1
     session['current_game'] = session_id
     session['target_word'] = target_word
     session['guesses'] = []
@@ -173,7 +210,13 @@ def make_guess():
         return jsonify({'error': 'No active game session'})
     
     # Get and validate the guess
-    guess = request.json.get('guess', '').strip()
+    try:
+        payload = orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return jsonify({'error': 'Invalid request body'})
+    if not isinstance(payload, dict) or not isinstance(payload.get('guess', ''), str):
+        return jsonify({'error': 'Invalid request body'})
+    guess = payload.get('guess', '').strip()
     is_valid, processed_guess = GameLogic.validate_guess(guess)
     
     if not is_valid:
@@ -186,25 +229,30 @@ def make_guess():
     
     # Analyze the guess
     target_word = session['target_word']
-    guess_result = GameLogic.analyze_guess(processed_guess, target_word)
+    guess_word, guess_status = GameLogic.analyze_guess(processed_guess, target_word)
     
     # Update session data
-    current_guesses.append(guess_result)
+    current_guesses.append((guess_word, guess_status))
     session['guesses'] = current_guesses
     
-    # Save guess to database
-    game_repo.save_guess(session['current_game'], processed_guess, len(current_guesses))
-    
     # Check if game is completed
     is_won = processed_guess == target_word.upper()
     is_completed = is_won or len(current_guesses) >= Config.MAX_GUESSES_PER_GAME
     
+    # Save guess (and completion) to database in a single transaction
+    saved = game_repo.finish_turn(session['current_game'], processed_guess,
+                                  len(current_guesses), is_completed, is_won)
     if is_completed:
-        game_repo.complete_game_session(session['current_game'], is_won)
+        if saved:
+            report_repo.invalidate(session['username'], g.today)
+        else:
+            # Force a recount from the database on the next check
+            session.pop('games_today', None)
     
     # Return game state
     return jsonify({
-        'result': guess_result,
+        'guess': guess_word,
+        'result': guess_status,
         'is_won': is_won,
         'is_completed': is_completed,
         'guesses_left': Config.MAX_GUESSES_PER_GAME - len(current_guesses),
@@ -218,7 +266,10 @@ def make_guess():
 @admin_required
 def daily_report():
     """Admin daily report page"""
-    report_date = request.args.get('date', str(date.today()))
+    try:
+        report_date = date.fromisoformat(request.args.get('date', ''))
+    except ValueError:
+        report_date = g.today
     
     # Get daily statistics
     stats = report_repo.get_daily_report(report_date)
@@ -263,16 +314,19 @@ def internal_error(error):
                          error_message="Internal server error"), 500
 
 # --- UTILITY FUNCTIONS ---
+# Template config values never change at runtime, so build them once
+_CONFIG_CTX = {
+    'config': {
+        'MAX_DAILY_GAMES': Config.MAX_DAILY_GAMES,
+        'MAX_GUESSES_PER_GAME': Config.MAX_GUESSES_PER_GAME,
+        'WORD_LENGTH': Config.WORD_LENGTH
+    }
+}
+
 @app.context_processor
 def inject_config():
     """Make config variables available in templates"""
-    return {
-        'config': {
-            'MAX_DAILY_GAMES': Config.MAX_DAILY_GAMES,
-            'MAX_GUESSES_PER_GAME': Config.MAX_GUESSES_PER_GAME,
-            'WORD_LENGTH': Config.WORD_LENGTH
-        }
-    }
+    return _CONFIG_CTX
 
 if __name__ == '__main__':
     print("🎯 Guess the Word Game - OpenText Project")
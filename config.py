@@ -2,6 +2,7 @@
 Configuration settings for the Guess the Word Game
 """
 import os
+from datetime import timedelta
 
 class Config:
     """Base configuration class"""
@@ -9,6 +10,16 @@ class Config:
     # Flask Settings
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'opentext_guess_game_2025'
     
+    # Session Settings (server-side sessions stored in Redis)
+    SESSION_TYPE = 'redis'
+    SESSION_PERMANENT = False
+    SESSION_KEY_PREFIX = 'guess_game:'
+    PERMANENT_SESSION_LIFETIME = timedelta(hours=2)
+    REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    
+    # Admin reports are cached in Redis for this many seconds
+    REPORT_CACHE_TTL_SECONDS = 60
+    
     # Database Settings
     DATABASE_PATH = 'instance/guess_game.db'
     
@@ -18,12 +29,16 @@ class Config:
     WORD_LENGTH = 5
     
     # Initial words for the game (20 five-letter words)
-    INITIAL_WORDS = [
+    INITIAL_WORDS = (
         'APPLE', 'BRAVE', 'CHARM', 'DANCE', 'EAGLE',
         'FAITH', 'GRACE', 'HEART', 'IMAGE', 'JOLLY',
         'KNEEL', 'LIGHT', 'MAGIC', 'NOBLE', 'OCEAN',
         'PEACE', 'QUEEN', 'RADIO', 'STORM', 'TRUTH'
-    ]
+    )
+    WORD_SET = frozenset(INITIAL_WORDS)
+    
+    # Reject guesses that are not in WORD_SET
+    REQUIRE_KNOWN_WORDS = False
     
     # Admin User Credentials
     DEFAULT_ADMIN_USERNAME = 'Admin'
@@ -32,4 +47,7 @@ class Config:
     # Validation Rules
     MIN_USERNAME_LENGTH = 5
     MIN_PASSWORD_LENGTH = 5
-    REQUIRED_SPECIAL_CHARS = '$%*@'
\ No newline at end of file
+    REQUIRED_SPECIAL_CHARS = '$%*@'
+    
+    # Successful logins are cached for up to this many seconds
+    AUTH_CACHE_TTL_SECONDS = 60
\ No newline at end of file
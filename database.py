@@ -4,15 +4,70 @@ Handles all SQLite database interactions
 """
 import sqlite3
 import os
+import pickle
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 from datetime import datetime, date
+import redis
 from config import Config
 from models import PasswordManager
 
+# Keep one connection per OS thread even when gevent has patched
+# threading.local into a per-greenlet local
+try:
+    from gevent.monkey import get_original
+    thread_local = get_original('_thread', '_local')
+except ImportError:
+    thread_local = threading.local
+
+# Store dates as ISO strings and read DATE columns back as date objects
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+
+# Shared Redis client for sessions and report caching
+redis_client = redis.Redis.from_url(Config.REDIS_URL)
+
+def redis_cache(key, ttl):
+    """Cache a repository method's result in Redis, falling back to the database if Redis is down"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(self, *args):
+            cache_key = key(*args)
+            try:
+                cached = redis_client.get(cache_key)
+            except redis.RedisError:
+                return f(self, *args)
+            if cached is not None:
+                return pickle.loads(cached)
+            
+            result = f(self, *args)
+            try:
+                redis_client.setex(cache_key, ttl, pickle.dumps(result))
+            except redis.RedisError:
+                pass
+            return result
+        return decorated_function
+    return decorator
+
 class DatabaseManager:
     """Manages all database operations"""
     
+    # Connection pragmas applied once per pooled connection
+    CONNECTION_PRAGMAS = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA cache_size=-8192',
+    )
+    
     def __init__(self):
         self.db_path = Config.DATABASE_PATH
+        self._local = thread_local()
+        # Words are static for a run, so games pick from this list instead of the words table
+        self.word_cache = list(Config.INITIAL_WORDS)
         self.ensure_instance_directory()
         self.init_database()
     
@@ -23,25 +78,39 @@ class DatabaseManager:
             os.makedirs(instance_dir)
     
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+        """Get the pooled database connection for the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=256, detect_types=sqlite3.PARSE_DECLTYPES)
+            for pragma in self.CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+        return conn
     
-    def init_database(self):
-        """Initialize database with all required tables and initial data"""
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements in a single write transaction"""
         conn = self.get_connection()
         cursor = conn.cursor()
-        
+        cursor.execute('BEGIN IMMEDIATE')
         try:
-            self._create_tables(cursor)
-            self._insert_initial_words(cursor)
-            self._create_default_admin(cursor)
-            conn.commit()
+            yield cursor
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+    
+    def init_database(self):
+        """Initialize database with all required tables and initial data"""
+        try:
+            with self.transaction() as cursor:
+                self._create_tables(cursor)
+                self._insert_initial_words(cursor)
+                self._create_default_admin(cursor)
             print("✅ Database initialized successfully")
         except Exception as e:
             print(f"❌ Database initialization error: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
     
     def _create_tables(self, cursor):
         """Create all required database tables"""
@@ -92,12 +161,20 @@ class DatabaseManager:
             )
         ''')
         
+        # Indexes for daily game counts, reports and guess lookups
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user_date ON game_sessions(user_id, game_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_date ON game_sessions(game_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_guesses_session ON guesses(session_id)')
+        
+        # Refresh planner statistics so the indexes are used
+        cursor.execute('ANALYZE')
+        
         print("✅ Database tables created")
     
     def _insert_initial_words(self, cursor):
         """Insert initial 20 words if they don't exist"""
-        for word in Config.INITIAL_WORDS:
-            cursor.execute('INSERT OR IGNORE INTO words (word) VALUES (?)', (word,))
+        cursor.executemany('INSERT OR IGNORE INTO words (word) VALUES (?)',
+                           [(word,) for word in Config.INITIAL_WORDS])
         print("✅ Initial words loaded")
     
     def _create_default_admin(self, cursor):
@@ -117,61 +194,62 @@ class UserRepository:
     
     def create_user(self, username, password):
         """Create a new user account"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
-        
         try:
             password_hash = PasswordManager.hash_password(password)
-            cursor.execute('''
-                INSERT INTO users (username, password_hash, user_type) 
-                VALUES (?, ?, ?)
-            ''', (username, password_hash, 'player'))
-            user_id = cursor.lastrowid
-            conn.commit()
+            with self.db_manager.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO users (username, password_hash, user_type) 
+                    VALUES (?, ?, ?)
+                ''', (username, password_hash, 'player'))
+                user_id = cursor.lastrowid
             return True, user_id
         except sqlite3.IntegrityError:
             return False, "Username already exists"
         except Exception as e:
             return False, str(e)
-        finally:
-            conn.close()
     
     def authenticate_user(self, username, password):
         """Authenticate user login"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
+        password_hash = PasswordManager.hash_password(password)
+        time_bucket = int(time.time()) // Config.AUTH_CACHE_TTL_SECONDS
         
         try:
-            cursor.execute('''
-                SELECT id, username, password_hash, user_type 
-                FROM users 
-                WHERE username = ?
-            ''', (username,))
-            
-            user_data = cursor.fetchone()
-            if not user_data:
-                return False, None, "Invalid username"
-            
-            user_id, username, stored_hash, user_type = user_data
-            
-            if PasswordManager.verify_password(password, stored_hash):
-                return True, {
-                    'id': user_id,
-                    'username': username,
-                    'user_type': user_type
-                }, "Login successful"
-            else:
-                return False, None, "Invalid password"
-        
+            user = self._verify_credentials(username, password_hash, time_bucket)
+            return True, dict(user), "Login successful"
         except Exception as e:
             return False, None, str(e)
-        finally:
-            conn.close()
+    
+    @lru_cache(maxsize=1024)
+    def _verify_credentials(self, username, password_hash, time_bucket):
+        """
+        Look up and verify credentials, caching successful logins per time bucket.
+        Failures raise LookupError so they are never cached.
+        """
+        cursor = self.db_manager.get_connection().cursor()
+        cursor.execute('''
+            SELECT id, username, password_hash, user_type 
+            FROM users 
+            WHERE username = ?
+        ''', (username,))
+        
+        user_data = cursor.fetchone()
+        if not user_data:
+            raise LookupError("Invalid username")
+        
+        user_id, username, stored_hash, user_type = user_data
+        
+        if not PasswordManager.verify_password_hash(password_hash, stored_hash):
+            raise LookupError("Invalid password")
+        
+        return {
+            'id': user_id,
+            'username': username,
+            'user_type': user_type
+        }
     
     def get_all_players(self):
         """Get list of all player usernames for admin reports"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
+        cursor = self.db_manager.get_connection().cursor()
         
         try:
             cursor.execute('''
@@ -183,8 +261,6 @@ class UserRepository:
         except Exception as e:
             print(f"Error getting players: {e}")
             return []
-        finally:
-            conn.close()
 
 class GameRepository:
     """Handles game-related database operations"""
@@ -193,27 +269,14 @@ class GameRepository:
         self.db_manager = db_manager
     
     def get_random_word(self):
-        """Get a random word for the game"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('SELECT word FROM words ORDER BY RANDOM() LIMIT 1')
-            result = cursor.fetchone()
-            return result[0] if result else None
-        except Exception as e:
-            print(f"Error getting random word: {e}")
+        """Get a random word for the game from the in-memory word cache"""
+        if not self.db_manager.word_cache:
             return None
-        finally:
-            conn.close()
+        return random.choice(self.db_manager.word_cache)
     
-    def get_daily_game_count(self, user_id, game_date=None):
+    def get_daily_game_count(self, user_id, game_date):
         """Get number of games played by user on a specific date"""
-        if game_date is None:
-            game_date = date.today()
-        
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
+        cursor = self.db_manager.get_connection().cursor()
         
         try:
             cursor.execute('''
@@ -224,65 +287,66 @@ class GameRepository:
         except Exception as e:
             print(f"Error getting daily game count: {e}")
             return 0
-        finally:
-            conn.close()
     
-    def create_game_session(self, user_id, target_word):
-        """Create a new game session"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
-        
+    def create_game_session(self, user_id, target_word, game_date):
+        """Create a new game session for the given date"""
         try:
-            today = date.today()
-            cursor.execute('''
-                INSERT INTO game_sessions (user_id, target_word, game_date) 
-                VALUES (?, ?, ?)
-            ''', (user_id, target_word, today))
-            session_id = cursor.lastrowid
-            conn.commit()
+            with self.db_manager.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO game_sessions (user_id, target_word, game_date) 
+                    VALUES (?, ?, ?)
+                ''', (user_id, target_word, game_date))
+                session_id = cursor.lastrowid
             return session_id
         except Exception as e:
             print(f"Error creating game session: {e}")
             return None
-        finally:
-            conn.close()
     
     def save_guess(self, session_id, guess_word, guess_number):
         """Save a guess to the database"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT INTO guesses (session_id, guess_word, guess_number) 
-                VALUES (?, ?, ?)
-            ''', (session_id, guess_word, guess_number))
-            conn.commit()
+            with self.db_manager.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO guesses (session_id, guess_word, guess_number) 
+                    VALUES (?, ?, ?)
+                ''', (session_id, guess_word, guess_number))
             return True
         except Exception as e:
             print(f"Error saving guess: {e}")
             return False
-        finally:
-            conn.close()
     
     def complete_game_session(self, session_id, is_won):
         """Mark a game session as completed"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                UPDATE game_sessions 
-                SET is_completed = TRUE, is_won = ? 
-                WHERE id = ?
-            ''', (is_won, session_id))
-            conn.commit()
+            with self.db_manager.transaction() as cursor:
+                cursor.execute('''
+                    UPDATE game_sessions 
+                    SET is_completed = TRUE, is_won = ? 
+                    WHERE id = ?
+                ''', (is_won, session_id))
             return True
         except Exception as e:
             print(f"Error completing game session: {e}")
             return False
-        finally:
-            conn.close()
+    
+    def finish_turn(self, session_id, guess_word, guess_number, is_completed, is_won):
+        """Save a guess and, if the game is over, complete the session in one transaction"""
+        try:
+            with self.db_manager.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO guesses (session_id, guess_word, guess_number) 
+                    VALUES (?, ?, ?)
+                ''', (session_id, guess_word, guess_number))
+                if is_completed:
+                    cursor.execute('''
+                        UPDATE game_sessions 
+                        SET is_completed = TRUE, is_won = ? 
+                        WHERE id = ?
+                    ''', (is_won, session_id))
+            return True
+        except Exception as e:
+            print(f"Error finishing turn: {e}")
+            return False
 
 class ReportRepository:
     """Handles admin reporting database operations"""
@@ -290,52 +354,67 @@ class ReportRepository:
     def __init__(self, db_manager):
         self.db_manager = db_manager
     
+    def invalidate(self, username, report_date):
+        """Drop cached reports affected by a game played by username on report_date"""
+        try:
+            redis_client.delete(f'report:daily:{report_date}', f'report:user:{username}')
+        except redis.RedisError as e:
+            print(f"Error invalidating report cache: {e}")
+    
     def get_daily_report(self, report_date):
         """Get daily statistics for admin report"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                SELECT 
-                    COUNT(DISTINCT user_id) as total_users,
-                    COUNT(*) as total_games,
-                    SUM(CASE WHEN is_won = 1 THEN 1 ELSE 0 END) as correct_guesses
-                FROM game_sessions 
-                WHERE game_date = ?
-            ''', (report_date,))
-            
-            return cursor.fetchone()
+            return self._query_daily_report(report_date)
         except Exception as e:
             print(f"Error getting daily report: {e}")
             return (0, 0, 0)
-        finally:
-            conn.close()
     
     def get_user_report(self, username):
         """Get user-specific statistics for admin report"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                SELECT 
-                    gs.game_date,
-                    COUNT(*) as words_tried,
-                    SUM(CASE WHEN gs.is_won = 1 THEN 1 ELSE 0 END) as correct_guesses
-                FROM game_sessions gs
-                JOIN users u ON gs.user_id = u.id
-                WHERE u.username = ?
-                GROUP BY gs.game_date
-                ORDER BY gs.game_date DESC
-            ''', (username,))
-            
-            return cursor.fetchall()
+            return self._query_user_report(username)
         except Exception as e:
             print(f"Error getting user report: {e}")
             return []
-        finally:
-            conn.close()
+    
+    @redis_cache(key=lambda report_date: f'report:daily:{report_date}', ttl=Config.REPORT_CACHE_TTL_SECONDS)
+    def _query_daily_report(self, report_date):
+        """Run the daily report query (errors propagate so they are never cached)"""
+        cursor = self.db_manager.get_connection().cursor()
+        cursor.execute('''
+            SELECT 
+                COUNT(DISTINCT user_id) as total_users,
+                COUNT(*) as total_games,
+                SUM(CASE WHEN is_won = 1 THEN 1 ELSE 0 END) as correct_guesses
+            FROM game_sessions 
+            WHERE game_date = ?
+        ''', (report_date,))
+        
+        return cursor.fetchone()
+    
+    @redis_cache(key=lambda username: f'report:user:{username}', ttl=Config.REPORT_CACHE_TTL_SECONDS)
+    def _query_user_report(self, username):
+        """Run the user report query (errors propagate so they are never cached)"""
+        cursor = self.db_manager.get_connection().cursor()
+        cursor.execute('''
+            SELECT 
+                gs.game_date,
+                COUNT(*) as words_tried,
+                SUM(CASE WHEN gs.is_won = 1 THEN 1 ELSE 0 END) as correct_guesses,
+                COALESCE(SUM(gc.guess_count), 0) as total_guesses
+            FROM game_sessions gs
+            JOIN users u ON gs.user_id = u.id
+            LEFT JOIN (
+                SELECT session_id, COUNT(*) as guess_count 
+                FROM guesses 
+                GROUP BY session_id
+            ) gc ON gc.session_id = gs.id
+            WHERE u.username = ?
+            GROUP BY gs.game_date
+            ORDER BY gs.game_date DESC
+        ''', (username,))
+        
+        return cursor.fetchall()
 
 # Global database manager instance
 db_manager = DatabaseManager()
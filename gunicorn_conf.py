@@ -0,0 +1,14 @@
+"""
+Gunicorn settings for running the Guess the Word Game in production
+Usage: gunicorn -c gunicorn_conf.py
+"""
+import multiprocessing
+import os
+
+# Requests spend most of their time waiting on SQLite and template rendering,
+# so cooperative gevent workers serve many requests per process
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('BIND') or '0.0.0.0:8000'
+worker_class = 'gevent'
+workers = int(os.environ.get('WEB_CONCURRENCY') or multiprocessing.cpu_count() * 2 + 1)
+worker_connections = 1000
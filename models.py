@@ -2,9 +2,20 @@
 Data models and validation functions for the Guess the Word Game
 """
 import hashlib
+import hmac
 import re
 from config import Config
 
+# Full validation rules, checked in a single pass on the success path
+USERNAME_RE = re.compile(
+    rf'(?=.*[a-z])(?=.*[A-Z])[A-Za-z]{{{Config.MIN_USERNAME_LENGTH},}}'
+)
+PASSWORD_RE = re.compile(
+    rf'(?=.*[A-Za-z])(?=.*[0-9])(?=.*[{re.escape(Config.REQUIRED_SPECIAL_CHARS)}])'
+    rf'.{{{Config.MIN_PASSWORD_LENGTH},}}',
+    re.DOTALL
+)
+
 class UserValidator:
     """Handles user input validation"""
     
@@ -16,6 +27,10 @@ class UserValidator:
         - Must contain both upper and lower case letters
         - Only alphabetic characters allowed
         """
+        if username and USERNAME_RE.fullmatch(username):
+            return True, "Valid username"
+        
+        # Failure path: work out which rule was broken
         if not username or len(username) < Config.MIN_USERNAME_LENGTH:
             return False, f"Username must be at least {Config.MIN_USERNAME_LENGTH} characters long"
         
@@ -28,7 +43,7 @@ class UserValidator:
         if not (has_upper and has_lower):
             return False, "Username must contain both upper and lower case letters"
         
-        return True, "Valid username"
+        return False, "Username must contain only letters A-Z"
     
     @staticmethod
     def validate_password(password):
@@ -39,6 +54,10 @@ class UserValidator:
         - Must contain numeric characters  
         - Must contain special characters ($, %, *, @)
         """
+        if password and PASSWORD_RE.fullmatch(password):
+            return True, "Valid password"
+        
+        # Failure path: work out which rule was broken
         if not password or len(password) < Config.MIN_PASSWORD_LENGTH:
             return False, f"Password must be at least {Config.MIN_PASSWORD_LENGTH} characters long"
         
@@ -55,7 +74,7 @@ class UserValidator:
         if not has_special:
             return False, f"Password must contain special characters ({Config.REQUIRED_SPECIAL_CHARS})"
         
-        return True, "Valid password"
+        return False, "Password must contain at least one ASCII letter (A-Z) and one ASCII digit (0-9)"
 
 class PasswordManager:
     """Handles password hashing and verification"""
@@ -66,9 +85,9 @@ class PasswordManager:
         return hashlib.sha256(password.encode()).hexdigest()
     
     @staticmethod
-    def verify_password(password, password_hash):
-        """Verify password against hash"""
-        return PasswordManager.hash_password(password) == password_hash
+    def verify_password_hash(password_hash, stored_hash):
+        """Verify an already hashed password against the stored hash in constant time"""
+        return hmac.compare_digest(password_hash, stored_hash)
 
 class GameLogic:
     """Handles game mechanics and word analysis"""
@@ -76,49 +95,37 @@ class GameLogic:
     @staticmethod
     def analyze_guess(guess, target_word):
         """
-        Analyze a guess against the target word and return color coding:
-        - 'correct': Letter is in correct position (Green)
-        - 'wrong_position': Letter is in word but wrong position (Orange)  
-        - 'not_in_word': Letter is not in the word (Grey)
+        Analyze a guess against the target word and return (guess, status_string).
+        The status string has one digit per letter:
+        - '2': Letter is in correct position (Green)
+        - '1': Letter is in word but wrong position (Orange)
+        - '0': Letter is not in the word (Grey)
         """
         guess = guess.upper()
-        target_word = target_word.upper()
-        result = []
+        guess_bytes = guess.encode('ascii')
+        target_bytes = target_word.upper().encode('ascii')
         
-        # Create copies to work with
-        target_letters = list(target_word)
-        guess_letters = list(guess)
+        # Remaining count of each letter A-Z in the target word
+        counts = [0] * 26
+        for b in target_bytes:
+            counts[b - 65] += 1
+        
+        # One ASCII status digit per letter, starting as '0' (not in word)
+        status = bytearray(b'0' * len(guess_bytes))
         
         # First pass: mark correct positions (exact matches)
-        for i in range(len(guess)):
-            if guess_letters[i] == target_letters[i]:
-                result.append({
-                    'letter': guess_letters[i], 
-                    'status': 'correct',
-                    'position': i
-                })
-                # Remove matched letters to avoid double counting
-                target_letters[i] = None
-                guess_letters[i] = None
-            else:
-                result.append({
-                    'letter': guess_letters[i], 
-                    'status': 'unknown',
-                    'position': i
-                })
-        
-        # Second pass: check for wrong positions and not in word
-        for i in range(len(result)):
-            if result[i]['status'] == 'unknown':
-                letter = guess_letters[i]
-                if letter in target_letters:
-                    result[i]['status'] = 'wrong_position'
-                    # Remove the matched letter to avoid double counting
-                    target_letters[target_letters.index(letter)] = None
-                else:
-                    result[i]['status'] = 'not_in_word'
-        
-        return result
+        for i, (g, t) in enumerate(zip(guess_bytes, target_bytes)):
+            if g == t:
+                status[i] = ord('2')
+                counts[g - 65] -= 1
+        
+        # Second pass: letters present elsewhere in the word, without double counting
+        for i, g in enumerate(guess_bytes):
+            if status[i] == ord('0') and counts[g - 65] > 0:
+                status[i] = ord('1')
+                counts[g - 65] -= 1
+        
+        return guess, status.decode('ascii')
     
     @staticmethod
     def validate_guess(guess):
@@ -131,9 +138,12 @@ class GameLogic:
         if len(guess) != Config.WORD_LENGTH:
             return False, f"Guess must be exactly {Config.WORD_LENGTH} letters"
         
-        if not guess.isalpha():
+        if not (guess.isascii() and guess.isalpha()):
             return False, "Guess must contain only letters"
         
+        if Config.REQUIRE_KNOWN_WORDS and guess not in Config.WORD_SET:
+            return False, "Guess is not in the word list"
+        
         return True, guess
 
 class User:
@@ -139,9 +139,9 @@ class WordGameController {
     
     async processGuessResult(data) {
         // Display the guess with animation
-        await this.displayGuessWithAnimation(data.result, this.currentRow);
+        await this.displayGuessWithAnimation(data.guess, data.result, this.currentRow);
         
-        this.guesses.push(data.result);
+        this.guesses.push([data.guess, data.result]);
         this.currentRow++;
         
         // Update game info
@@ -161,22 +161,23 @@ class WordGameController {
         }
     }
     
-    async displayGuessWithAnimation(result, rowIndex) {
+    async displayGuessWithAnimation(guess, result, rowIndex) {
         const animationDelay = 150; // ms between each letter animation
         
         for (let i = 0; i < result.length; i++) {
             const box = document.getElementById(`box-${rowIndex}-${i}`);
-            const letter = result[i];
+            const letter = guess[i];
+            const status = Number(result[i]);
             
             // Add letter with initial animation
             setTimeout(() => {
-                box.textContent = letter.letter;
+                box.textContent = letter;
                 box.classList.add('animate');
                 
                 // Add color class after a short delay for dramatic effect
                 setTimeout(() => {
                     box.classList.remove('animate');
-                    box.classList.add(this.getStatusClass(letter.status));
+                    box.classList.add(this.getStatusClass(status));
                 }, 100);
             }, i * animationDelay);
         }
@@ -188,12 +189,8 @@ class WordGameController {
     }
     
     getStatusClass(status) {
-        switch (status) {
-            case 'correct': return 'correct';
-            case 'wrong_position': return 'wrong-position';
-            case 'not_in_word': return 'not-in-word';
-            default: return '';
-        }
+        // Status digits from the server: 0 = not in word, 1 = wrong position, 2 = correct
+        return ['not-in-word', 'wrong-position', 'correct'][status] || '';
     }
     
     endGame(isWon, targetWord) {
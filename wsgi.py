@@ -0,0 +1,8 @@
+"""
+WSGI entrypoint for the Guess the Word Game
+Patches the standard library for gevent before the app is imported
+"""
+from gevent import monkey
+monkey.patch_all()
+
+from app import app  # noqa: E402